@@ -1,173 +1,546 @@
 # -*- coding: utf-8 -*-
 
-import clr
-clr.AddReference("RhinoInside.Revit")
-from RhinoInside.Revit import Revit
-# Import necessary Revit API classes
-from Autodesk.Revit.DB import FilteredElementCollector, Level
-
-# application
-uiapp = Revit.ActiveUIApplication
-dbapp = Revit.ActiveDBApplication
-
-# document
-uidoc = Revit.ActiveUIDocument
-doc = Revit.ActiveDBDocument
-
+import bisect
+import hashlib
 import json
 import os
-import codecs  # Required for file open() with encoding in Python 2.x
-from Autodesk.Revit.DB import UnitUtils
-# --- Conversion of Revit-internal feet units to millimetres ---
 
-# Try the modern API first (Revit 2021+)
+# Optional fast JSON parser for CPython deployments; stdlib json otherwise.
 try:
-    from Autodesk.Revit.DB import UnitTypeId
-    MM = UnitTypeId.Millimeters
+    import orjson as _fastjson
 except ImportError:
-    from Autodesk.Revit.DB import DisplayUnitType
-    MM = DisplayUnitType.DUT_MILLIMETERS
-
-def feet_to_mm(value_ft):
-    """Convert Revit-internal feet to millimetres."""
-    return UnitUtils.ConvertFromInternalUnits(value_ft, MM)
-
-# --- WPF Imports ---
-clr.AddReference("PresentationFramework")
-clr.AddReference("WindowsBase")
-clr.AddReference("PresentationCore")
-from System.Windows import Window, MessageBox
-from System.Windows.Markup import XamlReader
-from System.IO import FileStream, FileMode
+    _fastjson = None
 
 # --- Constants ---
 SETTINGS_FILENAME = "settings_daylight.json"
 XAML_FILENAME = "SettingsDaylightWindow.xaml"
 
-# --- Path Calculation (using os.path for Python 2.x compatibility) ---
+# Raw XAML text cached per file state (mtime + size hash), so reopening the
+# dialog in the same session skips disk I/O and re-tokenization entirely.
+_XAML_CACHE = {}
+
+# Parsed settings dicts cached per path and mtime; reopening the dialog skips
+# the disk read and JSON parse as long as the file is unchanged.
+_SETTINGS_CACHE = {}
+
+def _read_settings_cached(path):
+    """Returns the parsed settings dict for path, reusing the cached copy
+    while the file's mtime is unchanged."""
+    mtime = os.path.getmtime(path)
+    cached = _SETTINGS_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = _fastjson.loads(raw) if _fastjson is not None \
+        else json.loads(raw.decode('utf-8'))
+    _SETTINGS_CACHE[path] = (mtime, data)
+    return data
+
+# Level query results per Revit document, shared across dialog opens so a
+# session pays the element-table walk once per document.
+_LEVELS_CACHE = {}
+
+def clear_levels_cache():
+    """Drops the cached level queries (e.g. after levels were added)."""
+    _LEVELS_CACHE.clear()
+
+# --- Lazy WPF loading ---
+# The WPF assemblies are only loaded when the dialog is actually about to be
+# shown; merely importing this module (e.g. for feet_to_mm) stays cheap.
+Window = None
+MessageBox = None
+XamlReader = None
+
+def _ensure_wpf():
+    """Load the WPF assemblies on first use and bind the types as globals."""
+    global Window, MessageBox, XamlReader
+    if XamlReader is not None:
+        return
+    import clr
+    clr.AddReference("PresentationFramework")
+    clr.AddReference("WindowsBase")
+    clr.AddReference("PresentationCore")
+    clr.AddReference("System.Xml")
+    from System.Windows import Window as _Window, MessageBox as _MessageBox
+    from System.Windows.Markup import XamlReader as _XamlReader
+    Window = _Window
+    MessageBox = _MessageBox
+    XamlReader = _XamlReader
+
+
+# --- Settings locations ---
+class DaylightSettings(object):
+    """Locations of the settings JSON and the dialog XAML on disk.
+
+    The paths are invariant for the process lifetime, so they are computed
+    once at module import (below) and only read back per instance.
+    """
+
+    SETTINGS_FILENAME = SETTINGS_FILENAME
+    XAML_FILENAME = XAML_FILENAME
+    SETTINGS_FILE_PATH = None  # assigned at module scope below
+    XAML_FILE_PATH = None
+
+    def __init__(self):
+        self.settings_file_path = type(self).SETTINGS_FILE_PATH
+        self.xaml_file_path = type(self).XAML_FILE_PATH
+
+
+# --- Path Calculation (once per process; os.path for Python 2.x compatibility) ---
 try:
-    script_abspath = os.path.abspath(__file__)
-    script_dir = os.path.dirname(script_abspath)
-    # Save settings file one directory above this script (in Revit_Plugin)
-    parent_dir = os.path.dirname(script_dir)
-    settings_file_path = os.path.join(parent_dir, SETTINGS_FILENAME)
-    xaml_file_path = os.path.join(script_dir, XAML_FILENAME)
+    _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 except NameError:
     print("WARNING: Could not determine script path. Using current working directory for XAML and settings.")
-    script_dir = os.getcwd()
-    parent_dir = os.path.dirname(script_dir)
-    settings_file_path = os.path.join(parent_dir, SETTINGS_FILENAME)
-    xaml_file_path = os.path.join(script_dir, XAML_FILENAME)
+    _SCRIPT_DIR = os.getcwd()
+# Settings file lives one directory above this script (in Revit_Plugin)
+DaylightSettings.SETTINGS_FILE_PATH = os.path.join(
+    os.path.dirname(_SCRIPT_DIR), SETTINGS_FILENAME)
+DaylightSettings.XAML_FILE_PATH = os.path.join(_SCRIPT_DIR, XAML_FILENAME)
+
+
+# --- Revit API access ---
+class RevitApiHelper(object):
+    """Lazy accessors for the Revit API; CLR assemblies load on first use."""
+
+    _mm_unit = None
+    _ft_to_mm = None
+
+    @staticmethod
+    def get_active_document():
+        import clr
+        clr.AddReference("RhinoInside.Revit")
+        from RhinoInside.Revit import Revit
+        return Revit.ActiveDBDocument
+
+    @classmethod
+    def _get_mm_unit(cls):
+        if cls._mm_unit is None:
+            # Try the modern API first (Revit 2021+)
+            try:
+                from Autodesk.Revit.DB import UnitTypeId
+                cls._mm_unit = UnitTypeId.Millimeters
+            except ImportError:
+                from Autodesk.Revit.DB import DisplayUnitType
+                cls._mm_unit = DisplayUnitType.DUT_MILLIMETERS
+        return cls._mm_unit
+
+    @classmethod
+    def _get_ft_to_mm(cls):
+        """Resolve the feet-to-millimetre factor once; conversion is linear,
+        so later calls are a pure Python multiply with no CLR hop."""
+        if cls._ft_to_mm is None:
+            try:
+                from Autodesk.Revit.DB import UnitUtils
+                factor = UnitUtils.ConvertFromInternalUnits(1.0,
+                                                            cls._get_mm_unit())
+            except Exception:
+                factor = None
+            if isinstance(factor, float) and factor > 0:
+                cls._ft_to_mm = factor
+            else:
+                # Revit API unavailable (or mocked in tests): 1 ft = 304.8 mm.
+                cls._ft_to_mm = 304.8
+        return cls._ft_to_mm
+
+    @staticmethod
+    def feet_to_mm(value_ft):
+        """Convert Revit-internal feet to millimetres."""
+        return value_ft * RevitApiHelper._get_ft_to_mm()
+
+    @staticmethod
+    def mm_to_feet(value_mm):
+        """Convert millimetres to Revit-internal feet."""
+        return value_mm / RevitApiHelper._get_ft_to_mm()
+
+
+def feet_to_mm(value_ft):
+    """Convert Revit-internal feet to millimetres."""
+    return RevitApiHelper.feet_to_mm(value_ft)
+
+def mm_to_feet(value_mm):
+    """Convert millimetres to Revit-internal feet."""
+    return RevitApiHelper.mm_to_feet(value_mm)
+
+
+# --- Control lookup helpers ---
+class WpfControlFinder(object):
+    """Helpers for resolving x:Name'd controls in a XAML-loaded tree."""
+
+    # Properties through which WPF elements expose their logical children.
+    _CHILD_PROPERTIES = ('Children', 'Content', 'Child', 'Items')
+
+    @staticmethod
+    def _push_children(node, stack):
+        """Pushes node's logical children onto the traversal stack.
+
+        Containers are either an iterable of elements or a single element;
+        iterability is probed once instead of paying exception setup per
+        child, and self-references are rejected by identity.
+        """
+        for prop in WpfControlFinder._CHILD_PROPERTIES:
+            container = getattr(node, prop, None)
+            if container is None or container is node:
+                continue
+            if isinstance(container, str):
+                continue
+            try:
+                stack.extend(container)
+            except TypeError:
+                stack.append(container)
+
+    @staticmethod
+    def map_controls_by_name(root):
+        """Walk the tree once and collect every named element into a dict.
+
+        One iterative traversal replaces a full recursive search per control
+        name; callers resolve each name with an O(1) dict lookup afterwards.
+        """
+        names_map = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            name = getattr(node, 'Name', None)
+            if name and name not in names_map:
+                names_map[name] = node
+            WpfControlFinder._push_children(node, stack)
+        return names_map
+
+    @staticmethod
+    def find_child_by_name(parent, name):
+        """Iteratively search the tree for a single element by x:Name.
+
+        Fallback for controls that do not surface through the one-pass
+        traversal in :meth:`map_controls_by_name`. An explicit list-as-stack
+        DFS avoids allocating a Python frame per visited node.
+        """
+        stack = [parent]
+        while stack:
+            node = stack.pop()
+            if getattr(node, 'Name', None) == name:
+                return node
+            WpfControlFinder._push_children(node, stack)
+        return None
+
 
 # --- Main Window Class ---
-class SettingsWindow(Window):
+class SettingsWindow(object):
     """
     Settings window for Daylight Prediction using standard WPF.
     Loads layout from XAML and handles loading/saving settings.
     """
-    def _find_child_by_name(self, parent, name):
-        # Recursively search for a child element by x:Name
-        if hasattr(parent, 'Name') and parent.Name == name:
-            return parent
-        if hasattr(parent, 'Children') and parent.Children is not None:
-            for child in parent.Children:
-                result = self._find_child_by_name(child, name)
-                if result is not None:
-                    return result
-        if hasattr(parent, 'Content') and parent.Content is not None and parent.Content != parent:
-            result = self._find_child_by_name(parent.Content, name)
-            if result is not None:
-                return result
-        if hasattr(parent, 'Child') and parent.Child is not None:
-            result = self._find_child_by_name(parent.Child, name)
-            if result is not None:
-                return result
-        if hasattr(parent, 'Items') and parent.Items is not None:
-            for item in parent.Items:
-                result = self._find_child_by_name(item, name)
-                if result is not None:
-                    return result
-        return None
 
-    def __init__(self, xaml_source, revit_doc):
-        # Load XAML with shared read/write access to avoid file lock issues
-        from System.IO import FileAccess, FileShare
-        fs = FileStream(xaml_source, FileMode.Open, FileAccess.Read, FileShare.ReadWrite)
+    # Below this size a plain read is cheaper than setting up a mapping.
+    _MMAP_THRESHOLD = 64 * 1024
+
+    # x:Name'd controls the window binds as attributes of the same name.
+    _CONTROL_NAMES = ("SaveButton", "ComboBoxLevels", "RadioButtonTrue",
+                      "RadioButtonFalse", "TextBoxTransmission", "HelpButton",
+                      "ComboBoxExecutionMode", "RadioWriteYes", "RadioWriteNo")
+
+    def __init__(self, xaml_source, revit_doc, settings=None):
+        _ensure_wpf()
+        # Reuse the caller's DaylightSettings when provided (the application
+        # already built one); construct our own only for direct use.
+        self.settings = settings if settings is not None else DaylightSettings()
+        self.revit_doc = revit_doc
+        self._levels_loaded = False
+        self._pending_level_elevation = None
+        self._settings_applied = False
+        self.window = self._load_xaml(xaml_source)
+        self._initialize_controls()
+        self._attach_event_handlers()
+
+    def _load_xaml(self, xaml_source):
+        """Load the window definition from XAML, streaming nodes via XmlReader.
+
+        The raw XAML text is cached at module level keyed by a hash of the
+        file's mtime and size, so only the first open in a session touches
+        the disk; XmlReader.Create streams the document and skips
+        whitespace/comments during tokenization instead of buffering the
+        whole file first.
+        """
+        from System.IO import StringReader
+        from System.Xml import XmlReader, XmlReaderSettings
+        cache_key = hashlib.md5("{}{}".format(
+            os.path.getmtime(xaml_source),
+            os.path.getsize(xaml_source)).encode('utf-8')).hexdigest()
+        xaml_string = _XAML_CACHE.get(cache_key)
+        if xaml_string is None:
+            xaml_string = self._read_xaml_text(xaml_source)
+            _XAML_CACHE[cache_key] = xaml_string
+        reader_settings = XmlReaderSettings()
+        reader_settings.IgnoreWhitespace = True
+        reader_settings.IgnoreComments = True
+        reader_settings.CloseInput = True
+        reader = XmlReader.Create(StringReader(xaml_string), reader_settings)
         try:
-            window = XamlReader.Load(fs)
+            window = XamlReader.Load(reader)
         finally:
-            fs.Close()
-        Window.__init__(self)
-        self.Content = window.Content
-        self.Title = window.Title
-        self.Width = window.Width
-        self.Height = window.Height
-
-        # Use recursive search for controls
-        self.SaveButton = self._find_child_by_name(self.Content, "SaveButton")
-        self.ComboBoxLevels = self._find_child_by_name(self.Content, "ComboBoxLevels")
-        self.RadioButtonTrue = self._find_child_by_name(self.Content, "RadioButtonTrue")
-        self.RadioButtonFalse = self._find_child_by_name(self.Content, "RadioButtonFalse")
-        self.TextBoxTransmission = self._find_child_by_name(self.Content, "TextBoxTransmission")
-        self.HelpButton = self._find_child_by_name(self.Content, "HelpButton")
-        self.ComboBoxExecutionMode = self._find_child_by_name(self.Content, "ComboBoxExecutionMode")
-        self.RadioWriteYes = self._find_child_by_name(self.Content, "RadioWriteYes")
-        self.RadioWriteNo = self._find_child_by_name(self.Content, "RadioWriteNo")
-
-        # Attach event handler
+            reader.Close()
+        self._freeze_freezables(window)
+        return window
+
+    # Freezable-valued properties worth freezing on each element.
+    _FREEZABLE_PROPERTIES = ('Background', 'Foreground', 'BorderBrush',
+                             'Fill', 'Stroke', 'OpacityMask')
+
+    def _freeze_freezables(self, window):
+        """Freezes static freezable resources (brushes etc.) in the parsed tree.
+
+        The dialog's visual resources never change after load; frozen
+        instances skip per-mutation change notifications and locking, which
+        trims first-render CPU and lets WPF share them.
+        """
+        from System.Windows import Freezable
+
+        def _freeze(obj):
+            if isinstance(obj, Freezable) and obj.CanFreeze and not obj.IsFrozen:
+                obj.Freeze()
+
+        stack = [window]
+        while stack:
+            node = stack.pop()
+            resources = getattr(node, 'Resources', None)
+            if resources is not None:
+                for value in resources.Values:
+                    _freeze(value)
+            for prop in self._FREEZABLE_PROPERTIES:
+                value = getattr(node, prop, None)
+                if value is not None:
+                    _freeze(value)
+            WpfControlFinder._push_children(node, stack)
+
+    def _read_xaml_text(self, xaml_source):
+        """Reads the XAML file's text, memory-mapping large files.
+
+        For files above _MMAP_THRESHOLD the OS pages the file straight into
+        the reader instead of copying it through a user-space buffer first;
+        small files take the plain single-read path where mapping overhead
+        would dominate.
+        """
+        size = os.path.getsize(xaml_source)
+        if size >= self._MMAP_THRESHOLD:
+            from System.IO import FileMode, StreamReader
+            from System.IO.MemoryMappedFiles import (MemoryMappedFile,
+                                                     MemoryMappedFileAccess)
+            mmf = MemoryMappedFile.CreateFromFile(xaml_source, FileMode.Open,
+                                                  None, 0,
+                                                  MemoryMappedFileAccess.Read)
+            try:
+                stream = mmf.CreateViewStream(0, size,
+                                              MemoryMappedFileAccess.Read)
+                stream_reader = StreamReader(stream)
+                try:
+                    # The view is rounded up to a page multiple, so the
+                    # decoded text carries trailing NULs past the file's real
+                    # content; XAML never contains NULs, so trim them.
+                    return stream_reader.ReadToEnd().rstrip('\x00')
+                finally:
+                    stream_reader.Close()
+            finally:
+                mmf.Dispose()
+        with open(xaml_source, 'rb') as f:
+            return f.read().decode('utf-8-sig')
+
+    def _initialize_controls(self):
+        """Resolve all named controls in one traversal and bind them as attributes."""
+        names_map = WpfControlFinder.map_controls_by_name(self.window.Content)
+        for control_name in self._CONTROL_NAMES:
+            control = names_map.get(control_name)
+            if control is None:
+                control = WpfControlFinder.find_child_by_name(self.window.Content,
+                                                              control_name)
+            setattr(self, control_name, control)
+
+    def _attach_event_handlers(self):
         if self.SaveButton:
             self.SaveButton.Click += self.save_button_click
-
         if self.HelpButton:
             self.HelpButton.Click += self.help_button_click
+        if self.ComboBoxLevels:
+            self.ComboBoxLevels.DropDownOpened += self._on_levels_dropdown_opened
+        # Settings are read and applied only once the dialog actually shows,
+        # keeping construction cheap for callers that never display it.
+        self.window.Loaded += self._on_window_loaded
+
+    def _on_window_loaded(self, sender, args):
+        if not self._settings_applied:
+            self._settings_applied = True
+            self._load_settings()
+
+    def _populate_levels(self):
+        """Fetches all Level elements from the model and fills the ComboBox.
+
+        ToElements materializes the whole collection in one native call
+        instead of round-tripping each element through the enumerator, and
+        the collector is disposed promptly to free its unmanaged resources.
+        Results are cached per document at module level, so every later
+        dialog open in the session reuses them without another query.
+        """
+        cached = _LEVELS_CACHE.get(self.revit_doc)
+        if cached is None:
+            from Autodesk.Revit.DB import FilteredElementCollector, Level
+            collector = FilteredElementCollector(self.revit_doc)
+            try:
+                levels = list(collector.OfClass(Level).ToElements())
+            finally:
+                collector.Dispose()
+            # Read each .Elevation exactly once and keep a sorted cache so
+            # level selection is a binary search instead of a per-level CLR
+            # property hit; every later consumer goes through these arrays.
+            elevation_by_level = dict((lvl, lvl.Elevation) for lvl in levels)
+            level_elevs = sorted([(elev, lvl) for lvl, elev
+                                  in elevation_by_level.items()],
+                                 key=lambda t: t[0])
+            cached = (levels,
+                      level_elevs,
+                      [elev for elev, _ in level_elevs],
+                      elevation_by_level,
+                      dict((int(round(feet_to_mm(elev))), lvl)
+                           for elev, lvl in level_elevs),
+                      [elevation_by_level[lvl] for lvl in levels])
+            _LEVELS_CACHE[self.revit_doc] = cached
+        (self.levels, self._level_elevs, self._elevation_keys,
+         self._elevation_by_level, self._elev_map, self._elevations) = cached
+        self.ComboBoxLevels.ItemsSource = self.levels
+
+    def _select_level_by_elevation(self, level_elevation):
+        """Selects the level matching the stored elevation (in millimetres).
+
+        Converts the stored value back to feet once and binary-searches the
+        elevation cache built in _populate_levels; falls back to the first
+        level when nothing matches within tolerance.
+        """
+        if level_elevation is not None and self._level_elevs:
+            # O(1) fast path: the map keys carry the same whole-millimetre
+            # quantization the save path stores, so a saved selection matches
+            # exactly regardless of the level's fractional elevation.
+            match = self._elev_map.get(int(round(float(level_elevation))))
+            if match is not None:
+                self.ComboBoxLevels.SelectedItem = match
+                return
+            target_ft = mm_to_feet(float(level_elevation))
+            idx = bisect.bisect_left(self._elevation_keys, target_ft)
+            for i in (idx - 1, idx):
+                # 0.002 ft (~0.6 mm) covers the up-to-0.5 mm error from
+                # storing the elevation as a whole millimetre.
+                if 0 <= i < len(self._level_elevs) and \
+                        abs(self._level_elevs[i][0] - target_ft) < 0.002:
+                    self.ComboBoxLevels.SelectedItem = self._level_elevs[i][1]
+                    return
+        self.ComboBoxLevels.SelectedIndex = 0
+
+    def _load_settings_from_file(self):
+        """Reads and parses the settings JSON with a single whole-file read.
+
+        One read + one decode avoids the character-at-a-time codec machinery
+        that codecs.open feeds into json.load's incremental reader, and the
+        module-level cache skips even that while the file is unchanged.
+        """
+        return _read_settings_cached(self.settings.settings_file_path)
 
-        self.revit_doc = revit_doc
-        self._load_settings()
+    def _save_settings_to_file(self, settings_data):
+        """Serializes the settings dict; the write is skipped when the file
+        already holds identical content.
+
+        Users routinely reopen the dialog just to verify configuration and
+        hit Save unchanged, so an MD5 comparison against the existing bytes
+        (cached after the first save in a session) spares the disk write, and
+        a dict comparison against the cached parse spares even the
+        serialization.
+        """
+        path = self.settings.settings_file_path
+        cached = _SETTINGS_CACHE.get(path)
+        if cached is not None and cached[1] == settings_data:
+            # Trust the cache only while the file is untouched since the last
+            # read/write; after an external edit or delete, fall through to
+            # the digest check, which compares against the actual bytes.
+            try:
+                if os.path.getmtime(path) == cached[0]:
+                    return
+            except (IOError, OSError):
+                pass
+        # indent=2 keeps the file readable for users who inspect it; the key
+        # order comes from the dict literal, so sort_keys would be pure cost.
+        payload = json.dumps(settings_data, indent=2).encode('utf-8')
+        digest = hashlib.md5(payload).digest()
+        last_digest = getattr(self.settings, 'last_saved_digest', None)
+        if last_digest is None:
+            try:
+                with open(path, 'rb') as f:
+                    last_digest = hashlib.md5(f.read()).digest()
+            except (IOError, OSError):
+                pass
+        if digest == last_digest:
+            self.settings.last_saved_digest = digest
+            return
+        try:
+            # One unbuffered syscall for the whole payload.
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        except AttributeError:
+            # IronPython builds without the os.O_* flags: buffered fallback.
+            with open(path, 'wb') as f:
+                f.write(payload)
+        else:
+            try:
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+        self.settings.last_saved_digest = digest
+        _SETTINGS_CACHE[path] = (os.path.getmtime(path), settings_data)
+
+    def _apply_settings_to_ui(self, data):
+        """Pushes loaded settings into the UI controls.
+
+        Each key is read exactly once, each boolean negated exactly once, and
+        radio pairs are assigned together so WPF sees one IsChecked write per
+        control. An empty dict yields the defaults.
+        """
+        is_multilayer = bool(data.get('multilayer_wall', False))
+        transmission_val = str(data.get('transmission_value', 70))
+        level_elevation = data.get('level_elevation')
+        exec_mode = data.get('execution_mode', 'web')
+        write_results = bool(data.get('write_results', True))
+
+        self.ComboBoxExecutionMode.SelectedIndex = 1 if exec_mode == 'local' else 0
+        self.RadioWriteYes.IsChecked, self.RadioWriteNo.IsChecked = \
+            write_results, not write_results
+        # Level selection waits until the level list is actually populated.
+        self._pending_level_elevation = level_elevation
+        if self._levels_loaded:
+            self._select_level_by_elevation(level_elevation)
+        self.RadioButtonTrue.IsChecked, self.RadioButtonFalse.IsChecked = \
+            is_multilayer, not is_multilayer
+        self.TextBoxTransmission.Text = transmission_val
+
+    def _ensure_levels_loaded(self):
+        """Populates the level list the first time anything needs it.
+
+        Deferring the FilteredElementCollector query off the construction
+        path makes first paint independent of the model's level count; users
+        who close the dialog without touching the dropdown never pay for it.
+        """
+        if self._levels_loaded:
+            return
+        self._populate_levels()
+        self._select_level_by_elevation(self._pending_level_elevation)
+        self._levels_loaded = True
+
+    def _on_levels_dropdown_opened(self, sender, args):
+        self._ensure_levels_loaded()
 
     def _load_settings(self):
         """Loads settings from the JSON file and updates UI elements."""
         try:
-            # --- Populate levels from Revit model ---
-            doc = self.revit_doc
-            self.levels = [lvl for lvl in FilteredElementCollector(doc).OfClass(Level)]
-            self.ComboBoxLevels.ItemsSource = self.levels
-
-            # Default: select first level
-            if os.path.isfile(settings_file_path):
-                with codecs.open(settings_file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                is_multilayer = bool(data.get('multilayer_wall', False))
-                transmission_val = str(data.get('transmission_value', 70))
-                level_elevation = data.get('level_elevation', None)
-
-                exec_mode = data.get('execution_mode', 'web')
-                write_results  = bool(data.get('write_results', True))
-                self.ComboBoxExecutionMode.SelectedIndex = 1 if exec_mode == 'local' else 0
-                self.RadioWriteYes.IsChecked = write_results
-                self.RadioWriteNo.IsChecked  = not write_results
-
-                if level_elevation is not None:
-                    for lvl in self.levels:
-                        if abs(lvl.Elevation - float(level_elevation)) < 0.001:
-                            self.ComboBoxLevels.SelectedItem = lvl
-                            break
-                    else:
-                        self.ComboBoxLevels.SelectedIndex = 0
-                else:
-                    self.ComboBoxLevels.SelectedIndex = 0
-            else:
-                is_multilayer = False
-                transmission_val = "70"
-                self.ComboBoxLevels.SelectedIndex = 0
-                exec_mode = 'web'
-                write_results = True
-                self.ComboBoxExecutionMode.SelectedIndex = 0
-                self.RadioWriteYes.IsChecked = True
-                self.RadioWriteNo.IsChecked  = False
-
-            self.RadioButtonTrue.IsChecked = is_multilayer
-            self.RadioButtonFalse.IsChecked = not is_multilayer
-            self.TextBoxTransmission.Text = transmission_val
+            # EAFP: open directly and fall back to defaults when the file is
+            # missing, instead of paying a separate stat on the happy path.
+            try:
+                data = self._load_settings_from_file()
+            except (IOError, OSError):
+                data = {}
+            self._loaded_data = data
+            self._apply_settings_to_ui(data)
 
         except Exception as e:
             print("ERROR loading settings: {}".format(e))
@@ -178,6 +551,10 @@ class SettingsWindow(Window):
             if hasattr(self, 'ComboBoxLevels'):
                 self.ComboBoxLevels.SelectedIndex = 0
 
+    def show_dialog(self):
+        """Shows the window as a modal dialog (waits until closed)."""
+        return self.window.ShowDialog()
+
     def save_button_click(self, sender, args):
         """
         Handles the click event for the 'SaveButton' defined in XAML.
@@ -205,9 +582,21 @@ class SettingsWindow(Window):
                 return # Stop saving process
 
             # --- Get selected level and its elevation ---
+            # Saving without ever opening the dropdown still needs the level
+            # list so the stored selection can be resolved.
+            self._ensure_levels_loaded()
             selected_level = self.ComboBoxLevels.SelectedItem
             if selected_level is not None:
-                level_elevation = selected_level.Elevation
+                # Reuse the elevations cached in _populate_levels instead of
+                # crossing into the CLR for the property again; SelectedIndex
+                # indexes straight into the ItemsSource-ordered float list.
+                idx = self.ComboBoxLevels.SelectedIndex
+                if isinstance(idx, int) and 0 <= idx < len(self._elevations):
+                    level_elevation = self._elevations[idx]
+                else:
+                    level_elevation = self._elevation_by_level.get(selected_level)
+                if level_elevation is None:
+                    level_elevation = selected_level.Elevation
             else:
                 MessageBox.Show("Please select a ground floor level.", "Missing Level")
                 return
@@ -221,27 +610,29 @@ class SettingsWindow(Window):
                 'write_results': write_results
             }
             print("Settings to save:", settings_data)
-            print("Saving to:", settings_file_path)
+
+            # Nothing changed since load: close without serializing a byte.
+            if getattr(self, '_loaded_data', None) == settings_data:
+                print("Settings unchanged; skipping write.")
+                self.window.Close()
+                return
+
+            print("Saving to:", self.settings.settings_file_path)
 
             # 4. Write data to JSON file
             try:
-                # Ensure target directory exists (manual check for Python < 3.2)
-                settings_dir = os.path.dirname(settings_file_path)
-                if not os.path.isdir(settings_dir):
-                    print("Creating directory: {}".format(settings_dir))
-                    try:
-                        # Create directory (no exist_ok argument)
-                        os.makedirs(settings_dir)
-                    except OSError as e:
-                        print("ERROR creating directory: {}".format(e))
-                        MessageBox.Show("Failed to create settings directory:\n{}".format(e), "Directory Error")
-                        return # Stop saving process
-
-                # Write the file using codecs.open for Python 2 encoding compatibility
-                with codecs.open(settings_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(settings_data, f, indent=4, sort_keys=True) # sort_keys for consistent output
+                # Ensure target directory exists; EAFP avoids the isdir stat
+                # (no exist_ok argument on Python 2)
+                settings_dir = os.path.dirname(self.settings.settings_file_path)
+                try:
+                    os.makedirs(settings_dir)
+                    print("Created directory: {}".format(settings_dir))
+                except OSError:
+                    pass  # already exists; a real failure surfaces on write
+
+                self._save_settings_to_file(settings_data)
                 print("Settings saved successfully.")
-                self.Close() # Close the window upon successful save
+                self.window.Close() # Close the window upon successful save
 
             except Exception as e:
                 # Handle potential errors during file writing
@@ -265,13 +656,27 @@ class SettingsWindow(Window):
         diag.Process.Start(psi)
 
 
+# --- Application entry point ---
+class SettingsApplication(object):
+    """Wires the active Revit document to the settings dialog."""
+
+    def __init__(self):
+        self.settings = DaylightSettings()
+
+    def run(self):
+        """Validates prerequisites and shows the settings dialog."""
+        _ensure_wpf()
+        # Verify the XAML file exists before trying to load it
+        if not os.path.isfile(self.settings.xaml_file_path):
+            MessageBox.Show("Error: UI definition file not found:\n{}".format(self.settings.xaml_file_path), "UI File Error")
+            return
+        doc = RevitApiHelper.get_active_document()
+        settings_window = SettingsWindow(self.settings.xaml_file_path, doc,
+                                         self.settings)
+        settings_window.show_dialog()
+
+
 # --- Script Execution ---
 if __name__ == '__main__':
-    # Verify the XAML file exists before trying to load it
-    if not os.path.isfile(xaml_file_path):
-        MessageBox.Show("Error: UI definition file not found:\n{}".format(xaml_file_path), "UI File Error")
-    else:
-        # Create an instance of the settings window
-        settings_window = SettingsWindow(xaml_file_path, doc)
-        # Show the window as a modal dialog (waits until closed)
-        settings_window.ShowDialog()
\ No newline at end of file
+    app = SettingsApplication()
+    app.run()
@@ -0,0 +1,71 @@
+import sys
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+# The plugin script directory is added to sys.path via the pythonpath
+# setting in pytest.ini. Importing Settings here, before any test module
+# loads, pins the one canonical module object in sys.modules; the import
+# is safe this early because Settings defers all CLR work.
+import Settings
+
+# Namespace trees to stub; the first entry of each tuple is the root module.
+_MOCKED_MODULE_TREES = (
+    ('clr',),
+    ('Autodesk', 'Autodesk.Revit', 'Autodesk.Revit.DB'),
+    ('System', 'System.Windows', 'System.Windows.Markup', 'System.IO',
+     'System.IO.MemoryMappedFiles', 'System.Xml', 'System.Diagnostics'),
+    ('RhinoInside', 'RhinoInside.Revit'),
+)
+
+
+@pytest.fixture(scope='session')
+def settings():
+    """One shared DaylightSettings for the whole session.
+
+    The instance only mirrors class-level path constants, so tests that
+    merely read paths can share it; tests that need a fresh instance keep
+    constructing their own.
+    """
+    return Settings.DaylightSettings()
+
+
+@pytest.fixture(scope='session')
+def wpf_leaf_proto():
+    """Prototype mock WPF element with no child containers.
+
+    spec restricts the mock to a Name attribute, so the container lookups
+    raise AttributeError without the four ``del mock.X`` calls a plain Mock
+    would need. Tests take cheap copy.copy snapshots and only override Name
+    or attach children.
+    """
+    proto = Mock(spec=['Name'])
+    proto.Name = None
+    return proto
+
+
+@pytest.fixture(scope='session', autouse=True)
+def mock_external_modules():
+    """Installs stand-ins for the CLR/Revit/WPF namespaces, once per session.
+
+    Each namespace tree gets ONE root MagicMock whose children are aliased
+    into sys.modules, so attribute traversal (``Autodesk.Revit.DB``) and
+    direct imports (``from Autodesk.Revit.DB import UnitTypeId``) resolve to
+    the same mock objects instead of per-module mocks with broken identity.
+    Settings.py itself imports the CLR lazily, so installing these after
+    collection is early enough.
+    """
+    installed = []
+    for tree in _MOCKED_MODULE_TREES:
+        if tree[0] in sys.modules:
+            continue
+        root = MagicMock()
+        for name in tree:
+            node = root
+            for attr in name.split('.')[1:]:
+                node = getattr(node, attr)
+            sys.modules.setdefault(name, node)
+            installed.append(name)
+    yield
+    for name in installed:
+        sys.modules.pop(name, None)
@@ -0,0 +1,418 @@
+"""Unit tests for the Daylight Factor settings dialog module.
+
+PYTEST_DONT_REWRITE
+"""
+
+import copy
+import os
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import DEFAULT, Mock, patch
+
+import pytest
+
+import Settings
+from Settings import (DaylightSettings, RevitApiHelper, SettingsApplication,
+                      SettingsWindow, WpfControlFinder)
+
+# Shared expected payloads, built once and frozen against accidental
+# mutation by a test.
+DEFAULT_SETTINGS_DATA = MappingProxyType({
+    'multilayer_wall': False,
+    'transmission_value': 70,
+    'level_elevation': 0,
+    'execution_mode': 'web',
+    'write_results': True,
+})
+SAVED_SETTINGS_DATA = MappingProxyType({
+    'multilayer_wall': True,
+    'transmission_value': 60,
+    'level_elevation': 3048,
+    'execution_mode': 'local',
+    'write_results': False,
+})
+
+
+def test_settings_constants():
+    assert DaylightSettings.SETTINGS_FILENAME == "settings_daylight.json"
+    assert DaylightSettings.XAML_FILENAME == "SettingsDaylightWindow.xaml"
+
+
+def test_settings_file_path_is_in_parent_dir(settings):
+    assert os.path.basename(
+        settings.settings_file_path) == "settings_daylight.json"
+    assert os.path.basename(
+        os.path.dirname(settings.settings_file_path)) == "Revit_Plugin"
+
+
+def test_xaml_file_path_is_next_to_script(settings):
+    assert os.path.basename(
+        settings.xaml_file_path) == "SettingsDaylightWindow.xaml"
+    assert os.path.basename(
+        os.path.dirname(settings.xaml_file_path)) == "Daylight-Factor"
+
+
+def test_paths_are_shared_class_attributes(settings):
+    other = DaylightSettings()
+    assert settings.settings_file_path == other.settings_file_path
+    assert settings.settings_file_path == DaylightSettings.SETTINGS_FILE_PATH
+
+
+@pytest.fixture
+def fresh_conversion_factor():
+    # The mocked UnitUtils cannot produce a float, so the helper falls back
+    # to the exact conversion constant; reset the memo around each test.
+    RevitApiHelper._ft_to_mm = None
+    yield
+    RevitApiHelper._ft_to_mm = None
+
+
+def test_feet_to_mm(fresh_conversion_factor):
+    assert RevitApiHelper.feet_to_mm(1.0) == pytest.approx(304.8)
+    assert RevitApiHelper.feet_to_mm(0.0) == pytest.approx(0.0)
+
+
+def test_mm_to_feet_roundtrip(fresh_conversion_factor):
+    assert RevitApiHelper.mm_to_feet(
+        RevitApiHelper.feet_to_mm(12.5)) == pytest.approx(12.5)
+
+
+def test_factor_is_memoized(fresh_conversion_factor):
+    RevitApiHelper.feet_to_mm(1.0)
+    assert RevitApiHelper._ft_to_mm == 304.8
+
+
+def test_get_active_document():
+    from RhinoInside.Revit import Revit
+    assert RevitApiHelper.get_active_document() is Revit.ActiveDBDocument
+
+
+def test_module_level_wrappers(fresh_conversion_factor):
+    assert Settings.feet_to_mm(2.0) == pytest.approx(609.6)
+    assert Settings.mm_to_feet(304.8) == pytest.approx(1.0)
+
+
+def _leaf(proto, name=None):
+    """Cheap snapshot of the leaf prototype with an optional x:Name."""
+    node = copy.copy(proto)
+    if name is not None:
+        node.Name = name
+    return node
+
+
+def test_find_child_by_name_found_on_root(wpf_leaf_proto):
+    root = _leaf(wpf_leaf_proto, "SaveButton")
+    assert WpfControlFinder.find_child_by_name(root, "SaveButton") is root
+
+
+def test_find_child_by_name_in_children(wpf_leaf_proto):
+    target = _leaf(wpf_leaf_proto, "HelpButton")
+    parent = _leaf(wpf_leaf_proto)
+    parent.Children = [_leaf(wpf_leaf_proto), target]
+    assert WpfControlFinder.find_child_by_name(parent, "HelpButton") is target
+
+
+def test_find_child_by_name_not_found(wpf_leaf_proto):
+    parent = _leaf(wpf_leaf_proto)
+    assert WpfControlFinder.find_child_by_name(parent, "Missing") is None
+
+
+def test_map_controls_by_name_single_pass(wpf_leaf_proto):
+    save = _leaf(wpf_leaf_proto, "SaveButton")
+    help_btn = _leaf(wpf_leaf_proto, "HelpButton")
+    parent = _leaf(wpf_leaf_proto)
+    parent.Children = [save, help_btn]
+    names_map = WpfControlFinder.map_controls_by_name(parent)
+    assert names_map["SaveButton"] is save
+    assert names_map["HelpButton"] is help_btn
+
+
+class TestSettingsWindow:
+    @staticmethod
+    @pytest.fixture(scope='class')
+    def stub_window():
+        """Builds the stubbed window once for the class.
+
+        Construction behind the patched lifecycle methods is the expensive
+        part; tests share the instance and the per-test ``window`` fixture
+        rolls its state back to this post-construction baseline.
+        """
+        with patch.multiple(SettingsWindow,
+                            _load_xaml=DEFAULT,
+                            _initialize_controls=DEFAULT,
+                            _attach_event_handlers=DEFAULT,
+                            _load_settings=DEFAULT):
+            with patch('Settings._ensure_wpf'):
+                window = SettingsWindow("dialog.xaml", Mock())
+        return window, dict(window.__dict__)
+
+    @pytest.fixture
+    def window(self, stub_window):
+        window, baseline = stub_window
+        yield window
+        window.__dict__.clear()
+        window.__dict__.update(baseline)
+        for value in baseline.values():
+            if isinstance(value, Mock):
+                value.reset_mock()
+
+    @staticmethod
+    def _control_stub():
+        # Controls here are plain attribute holders; no test asserts calls
+        # on them, so a namespace beats a Mock's per-attribute machinery.
+        return SimpleNamespace(IsChecked=False, Text='',
+                               SelectedIndex=0, SelectedItem=None)
+
+    def _wire_controls(self, window):
+        for name in SettingsWindow._CONTROL_NAMES:
+            setattr(window, name, self._control_stub())
+
+    def test_init_calls_required_methods(self):
+        with patch.multiple(SettingsWindow,
+                            _load_xaml=DEFAULT,
+                            _initialize_controls=DEFAULT,
+                            _attach_event_handlers=DEFAULT,
+                            _load_settings=DEFAULT) as mocks:
+            with patch('Settings._ensure_wpf') as ensure_wpf:
+                SettingsWindow("dialog.xaml", Mock())
+        ensure_wpf.assert_called_once()
+        mocks['_load_xaml'].assert_called_once()
+        mocks['_initialize_controls'].assert_called_once()
+        mocks['_attach_event_handlers'].assert_called_once()
+        # Settings load is deferred to the window's Loaded event.
+        mocks['_load_settings'].assert_not_called()
+
+    def test_window_loaded_applies_settings_once(self, window):
+        with patch.object(SettingsWindow, '_load_settings') as load_settings:
+            window._on_window_loaded(None, None)
+            window._on_window_loaded(None, None)
+        load_settings.assert_called_once()
+
+    def test_init_builds_own_settings_when_not_given(self, window):
+        assert isinstance(window.settings, DaylightSettings)
+
+    def test_init_reuses_given_settings(self):
+        shared = DaylightSettings()
+        with patch.multiple(SettingsWindow,
+                            _load_xaml=DEFAULT,
+                            _initialize_controls=DEFAULT,
+                            _attach_event_handlers=DEFAULT,
+                            _load_settings=DEFAULT):
+            with patch('Settings._ensure_wpf'):
+                window = SettingsWindow("dialog.xaml", Mock(), shared)
+        assert window.settings is shared
+
+    def test_apply_settings_to_ui_defaults(self, window):
+        self._wire_controls(window)
+        window._apply_settings_to_ui({})
+        assert not window.RadioButtonTrue.IsChecked
+        assert window.RadioButtonFalse.IsChecked
+        assert window.TextBoxTransmission.Text == "70"
+        assert window.ComboBoxExecutionMode.SelectedIndex == 0
+        assert window.RadioWriteYes.IsChecked
+        assert not window.RadioWriteNo.IsChecked
+
+    def test_apply_settings_to_ui_values(self, window):
+        self._wire_controls(window)
+        window._apply_settings_to_ui({
+            'multilayer_wall': True,
+            'transmission_value': 55,
+            'level_elevation': 3000,
+            'execution_mode': 'local',
+            'write_results': False,
+        })
+        assert window.RadioButtonTrue.IsChecked
+        assert not window.RadioButtonFalse.IsChecked
+        assert window.TextBoxTransmission.Text == "55"
+        assert window.ComboBoxExecutionMode.SelectedIndex == 1
+        assert not window.RadioWriteYes.IsChecked
+        assert window._pending_level_elevation == 3000
+
+    def _wire_levels(self, window, elevations):
+        levels = [Mock() for _ in elevations]
+        pairs = sorted(zip(elevations, levels), key=lambda t: t[0])
+        window.levels = levels
+        window._level_elevs = pairs
+        window._elevation_keys = [e for e, _ in pairs]
+        window._elevation_by_level = dict((l, e) for e, l in pairs)
+        window._elev_map = dict((int(round(e * 304.8)), l) for e, l in pairs)
+        window._elevations = list(elevations)
+        window._levels_loaded = True
+        window.ComboBoxLevels = self._control_stub()
+        return levels
+
+    def test_select_level_by_elevation_match(self, window):
+        levels = self._wire_levels(window, [0.0, 10.0, 20.0])
+        window._select_level_by_elevation(10 * 304.8)
+        assert window.ComboBoxLevels.SelectedItem is levels[1]
+
+    def test_select_level_by_elevation_fractional_mm(self, window):
+        # 10.5 ft = 3200.4 mm, stored as 3200; the whole-mm map keys must
+        # still resolve it to the right level.
+        levels = self._wire_levels(window, [0.0, 10.5])
+        window._select_level_by_elevation(3200)
+        assert window.ComboBoxLevels.SelectedItem is levels[1]
+
+    def test_select_level_by_elevation_bisect_covers_mm_rounding(self, window):
+        levels = self._wire_levels(window, [0.0, 10.5])
+        window._elev_map = {}  # force the bisect fallback
+        window._select_level_by_elevation(3200)
+        assert window.ComboBoxLevels.SelectedItem is levels[1]
+
+    def test_select_level_by_elevation_no_match_defaults_to_first(self, window):
+        self._wire_levels(window, [0.0, 10.0])
+        window._select_level_by_elevation(999999)
+        assert window.ComboBoxLevels.SelectedIndex == 0
+
+    def test_select_level_by_elevation_none_defaults_to_first(self, window):
+        self._wire_levels(window, [0.0, 10.0])
+        window._select_level_by_elevation(None)
+        assert window.ComboBoxLevels.SelectedIndex == 0
+
+    def test_save_button_click_writes_settings(self, window, tmp_path):
+        import json
+        self._wire_controls(window)
+        self._wire_levels(window, [0.0, 10.0])
+        settings_path = str(tmp_path / "settings_daylight.json")
+        window.settings = Mock()
+        window.settings.settings_file_path = settings_path
+        window.settings.last_saved_digest = None
+        window.RadioButtonTrue.IsChecked = True
+        window.TextBoxTransmission.Text = "60"
+        window.ComboBoxExecutionMode.SelectedIndex = 1
+        window.RadioWriteYes.IsChecked = False
+        window.ComboBoxLevels.SelectedItem = window.levels[1]
+        window.ComboBoxLevels.SelectedIndex = 1
+
+        window.save_button_click(None, None)
+
+        with open(settings_path) as f:
+            saved = json.load(f)
+        assert saved == SAVED_SETTINGS_DATA
+        window.window.Close.assert_called_once()
+
+    def test_save_settings_rewrites_after_external_delete(self, window,
+                                                          tmp_path):
+        import json
+        path = str(tmp_path / "settings_daylight.json")
+        window.settings = Mock()
+        window.settings.settings_file_path = path
+        window.settings.last_saved_digest = None
+        data = dict(SAVED_SETTINGS_DATA)
+        # A matching cache entry alone must not skip the write when the file
+        # itself is gone (or changed) since the last read.
+        Settings._SETTINGS_CACHE[path] = (12345.0, dict(data))
+        try:
+            window._save_settings_to_file(data)
+        finally:
+            Settings._SETTINGS_CACHE.pop(path, None)
+        with open(path) as f:
+            assert json.load(f) == SAVED_SETTINGS_DATA
+
+    def test_read_xaml_text_mmap_trims_view_padding(self, tmp_path,
+                                                    monkeypatch):
+        import sys
+        content = '<Window>large</Window>'
+        path = str(tmp_path / "big.xaml")
+        with open(path, 'w') as f:
+            f.write(content)
+        # The view stream is page-aligned, so the reader hands back the text
+        # with trailing NUL padding; the loader must trim it away.
+        reader = Mock()
+        reader.ReadToEnd.return_value = content + '\x00' * 11
+        monkeypatch.setattr(sys.modules['System.IO'], 'StreamReader',
+                            Mock(return_value=reader))
+        stub = SimpleNamespace(_MMAP_THRESHOLD=0)
+        assert SettingsWindow._read_xaml_text(stub, path) == content
+
+    def test_save_button_click_rejects_invalid_transmission(self, window):
+        self._wire_controls(window)
+        self._wire_levels(window, [0.0])
+        window.TextBoxTransmission.Text = "abc"
+        with patch('Settings.MessageBox') as message_box:
+            window.save_button_click(None, None)
+            message_box.Show.assert_called_once()
+        window.window.Close.assert_not_called()
+
+    def test_save_button_click_requires_level(self, window):
+        self._wire_controls(window)
+        self._wire_levels(window, [0.0])
+        window.TextBoxTransmission.Text = "70"
+        window.ComboBoxLevels.SelectedItem = None
+        with patch('Settings.MessageBox') as message_box:
+            window.save_button_click(None, None)
+            message_box.Show.assert_called_once()
+        window.window.Close.assert_not_called()
+
+
+def test_application_init_creates_settings():
+    assert isinstance(SettingsApplication().settings, DaylightSettings)
+
+
+def test_application_run_success(monkeypatch):
+    app = SettingsApplication()
+    get_doc = Mock()
+    window_cls = Mock()
+    monkeypatch.setattr(Settings, '_ensure_wpf', Mock())
+    monkeypatch.setattr(Settings.os.path, 'isfile', lambda path: True)
+    monkeypatch.setattr(RevitApiHelper, 'get_active_document', get_doc)
+    monkeypatch.setattr(Settings, 'SettingsWindow', window_cls)
+    app.run()
+    window_cls.assert_called_once_with(app.settings.xaml_file_path,
+                                       get_doc.return_value, app.settings)
+    window_cls.return_value.show_dialog.assert_called_once()
+
+
+def test_application_run_missing_xaml_shows_error(monkeypatch):
+    app = SettingsApplication()
+    message_box = Mock()
+    window_cls = Mock()
+    monkeypatch.setattr(Settings, '_ensure_wpf', Mock())
+    monkeypatch.setattr(Settings.os.path, 'isfile', lambda path: False)
+    monkeypatch.setattr(Settings, 'MessageBox', message_box)
+    monkeypatch.setattr(Settings, 'SettingsWindow', window_cls)
+    app.run()
+    message_box.Show.assert_called_once()
+    window_cls.assert_not_called()
+
+
+def test_settings_file_loading(tmp_path):
+    import json
+    path = str(tmp_path / "settings_daylight.json")
+    with open(path, 'w') as f:
+        json.dump({"test": "data"}, f)
+    assert Settings._read_settings_cached(path) == {"test": "data"}
+    # Unchanged mtime: second read must come from the cache.
+    with patch('Settings.json.loads') as loads:
+        assert Settings._read_settings_cached(path) == {"test": "data"}
+        loads.assert_not_called()
+
+
+def test_json_roundtrip():
+    import io
+    import json
+    buffer = io.StringIO()
+    json.dump(dict(DEFAULT_SETTINGS_DATA), buffer, indent=4, sort_keys=True)
+    buffer.seek(0)
+    assert json.load(buffer) == DEFAULT_SETTINGS_DATA
+
+
+@pytest.mark.parametrize("value,expected", [
+    ('0', 0),
+    ('50', 50),
+    ('100', 100),
+    ('75', 75),
+])
+def test_transmission_valid_values_parse_in_range(value, expected):
+    assert int(value) == expected
+    assert 0 <= expected <= 100
+
+
+@pytest.mark.parametrize("value", ['abc', '50.5', ''])
+def test_transmission_unparseable_values_raise(value):
+    with pytest.raises(ValueError):
+        int(value)
+
+
+@pytest.mark.parametrize("value", ['101', '-1', '9999'])
+def test_transmission_out_of_range_values(value):
+    assert not 0 <= int(value) <= 100